@@ -1,6 +1,13 @@
+import hmac
+import json
 import os
-from datetime import datetime, timedelta, timezone
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
+import redis
 import requests
 
 from dotenv import load_dotenv
@@ -12,6 +19,7 @@ from flask import (
     request,
     flash,
 )
+from flask_compress import Compress
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import (
     LoginManager,
@@ -21,8 +29,14 @@ from flask_login import (
     current_user,
     UserMixin,
 )
-from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import func
+from werkzeug.security import check_password_hash
+from sqlalchemy import DDL, event, func, tuple_
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.orm import raiseload, selectinload
+import bcrypt
+from cachetools import TTLCache
 
 # ------------------------------------------------------------------------------
 # Инициализация приложения
@@ -40,11 +54,77 @@ app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
 )
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    # проверяем соединение перед выдачей и не держим его дольше таймаутов pgbouncer/LB
+    "pool_pre_ping": True,
+    "pool_recycle": 300,
+}
+
+_db_url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+if _db_url.get_backend_name() == "postgresql":
+    # пул на процесс: воркеры gunicorn × (pool_size + max_overflow)
+    # не должны превышать max_connections Postgres (или лимит pgbouncer)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"].update(
+        pool_size=int(os.environ.get("DB_POOL_SIZE", 10)),
+        max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", 20)),
+    )
+
+# в разработке/CI: любая незапланированная ленивая загрузка на дашборде – ошибка (ловим N+1)
+app.config["SQLALCHEMY_RAISELOAD"] = os.environ.get("SQLALCHEMY_RAISELOAD") == "1"
+
+# стоимость bcrypt (2^rounds итераций); подбирается так, чтобы хеш занимал ~100–250 мс
+app.config["BCRYPT_ROUNDS"] = int(os.environ.get("BCRYPT_ROUNDS", 12))
+
 db = SQLAlchemy(app)
 
 login_manager = LoginManager(app)
 login_manager.login_view = "login"
 
+# gzip/br для HTML с данными диаграмм
+Compress(app)
+
+# Redis необязателен: без REDIS_URL кэш просто выключен и всё читается из БД
+REDIS_URL = os.environ.get("REDIS_URL")
+redis_client = redis.Redis.from_url(REDIS_URL) if REDIS_URL else None
+
+
+def cache_get(key: str):
+    if redis_client is None:
+        return None
+    try:
+        return redis_client.get(key)
+    except redis.RedisError:
+        # кэш недоступен – работаем напрямую с БД
+        return None
+
+
+def cache_set(key: str, value: str, ttl: int) -> None:
+    if redis_client is None:
+        return
+    try:
+        redis_client.setex(key, ttl, value)
+    except redis.RedisError:
+        pass
+
+
+def cache_delete(*keys: str) -> None:
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(*keys)
+    except redis.RedisError:
+        pass
+
+
+def cache_set_many(mapping: dict[str, str]) -> None:
+    """Несколько ключей без TTL одной командой MSET."""
+    if redis_client is None:
+        return
+    try:
+        redis_client.mset(mapping)
+    except redis.RedisError:
+        pass
+
 #Запрос валют
 
 def fetch_currency_rates():
@@ -73,6 +153,71 @@ def fetch_currency_rates():
 # Модели
 # ------------------------------------------------------------------------------
 
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+
+def _bcrypt_secret(password: str) -> bytes:
+    """bcrypt учитывает только первые 72 байта пароля – обрезаем явно."""
+    return password.encode("utf-8")[:72]
+
+
+# bcrypt отпускает GIL на время расчёта хеша, поэтому хватает пула потоков:
+# KDF выполняется параллельно на всех ядрах, а число одновременных хешей
+# ограничено числом ядер. Потоки стартуют лениво, уже в воркере после fork.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt"
+)
+
+
+def hash_password(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=app.config["BCRYPT_ROUNDS"])
+    future = _hash_executor.submit(bcrypt.hashpw, _bcrypt_secret(password), salt)
+    return future.result().decode("ascii")
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    future = _hash_executor.submit(
+        bcrypt.checkpw, _bcrypt_secret(password), password_hash.encode("ascii")
+    )
+    return future.result()
+
+
+# недавно подтверждённые пары (пароль, хеш): повторный вход не пересчитывает bcrypt.
+# Ключ – HMAC от SECRET_KEY, сам пароль в памяти не хранится.
+# Кэшируем только успешные проверки, чтобы не давать оракула по времени.
+_verify_cache = TTLCache(maxsize=4096, ttl=60)
+_verify_cache_lock = threading.Lock()
+
+
+def _verify_cache_key(password: str, password_hash: str) -> bytes:
+    return hmac.new(
+        app.config["SECRET_KEY"].encode("utf-8"),
+        password.encode("utf-8") + password_hash.encode("ascii"),
+        "sha256",
+    ).digest()
+
+
+class utcnow(FunctionElement):
+    """Текущее время в UTC без часового пояса – как datetime.utcnow() в коде.
+
+    Колонки created_at naive, а now() в PostgreSQL отдаёт время в часовом
+    поясе сессии – поэтому явно переводим в UTC.
+    """
+
+    type = db.DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(element, compiler, **kw):
+    return "timezone('UTC', now())"
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    # в SQLite CURRENT_TIMESTAMP и так в UTC
+    return "CURRENT_TIMESTAMP"
+
 
 class User(UserMixin, db.Model):
     __tablename__ = "users"
@@ -84,35 +229,67 @@ class User(UserMixin, db.Model):
 
     initial_balance = db.Column(db.Numeric(14, 2), nullable=True)
 
-    categories = db.relationship("Category", backref="user", lazy=True)
-    transactions = db.relationship("Transaction", backref="user", lazy=True)
+    # коллекции не загружаются целиком: user.transactions – это запрос,
+    # к которому нужно явно добавить фильтры/limit
+    categories = db.relationship("Category", backref="user", lazy="dynamic")
+    transactions = db.relationship("Transaction", backref="user", lazy="dynamic")
 
-    created_at = db.Column(
-        db.DateTime,
-        nullable=False,
-        default=datetime.now(timezone.utc),  # ВАЖНО: без скобок!
-    )
+    # время (UTC) проставляет сама БД в момент вставки
+    created_at = db.Column(db.DateTime, nullable=False, server_default=utcnow())
 
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        if self.needs_rehash():
+            # старые хеши werkzeug (pbkdf2:/scrypt:) проверяем по-старому
+            return check_password_hash(self.password_hash, password)
+
+        key = _verify_cache_key(password, self.password_hash)
+        with _verify_cache_lock:
+            if key in _verify_cache:
+                return True
+
+        ok = verify_password(password, self.password_hash)
+        if ok:
+            with _verify_cache_lock:
+                _verify_cache[key] = True
+        return ok
+
+    def needs_rehash(self) -> bool:
+        """Хеш создан не bcrypt (наследие werkzeug) – его нужно пересчитать."""
+        return not self.password_hash.startswith(BCRYPT_PREFIXES)
 
 
 class Category(db.Model):
     __tablename__ = "categories"
+    __table_args__ = (
+        # выпадающие списки категорий на дашборде и в форме редактирования
+        db.Index("ix_categories_user_type", "user_id", "type"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     type = db.Column(db.String(10), nullable=False)  # "income" | "expense"
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
 
-    transactions = db.relationship("Transaction", backref="category", lazy=True)
+    # many-to-one сторона грузится пачкой (один IN-запрос на список транзакций);
+    # обратную коллекцию оставляем ленивой, чтобы не тянуть всю историю
+    transactions = db.relationship(
+        "Transaction",
+        backref=db.backref("category", lazy="selectin"),
+        lazy=True,
+    )
 
 
 class Transaction(db.Model):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # дашборд всегда фильтрует по пользователю и периоду, иногда ещё по типу
+        # id в конце – для keyset-пагинации по (created_at, id)
+        db.Index("ix_tx_user_created", "user_id", "created_at", "id"),
+        db.Index("ix_tx_user_type_created", "user_id", "type", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -123,7 +300,94 @@ class Transaction(db.Model):
     type = db.Column(db.String(10), nullable=False)  # "income" | "expense"
 
     description = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=utcnow())
+
+
+class UserBalance(db.Model):
+    """Суммы доходов/расходов пользователя за всё время.
+
+    Приложение сюда не пишет: строки поддерживает триггер на transactions
+    (только PostgreSQL, см. USER_BALANCES_DDL).
+    """
+
+    __tablename__ = "user_balances"
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    # без ограничения точности: сумма за всё время может превысить Numeric(14,2)
+    income = db.Column(db.Numeric(), nullable=False, default=0)
+    expense = db.Column(db.Numeric(), nullable=False, default=0)
+
+
+USER_BALANCES_DDL = """
+CREATE TABLE IF NOT EXISTS user_balances (
+    user_id INTEGER PRIMARY KEY REFERENCES users (id),
+    income NUMERIC NOT NULL DEFAULT 0,
+    expense NUMERIC NOT NULL DEFAULT 0
+);
+
+-- в базах, созданных раньше, колонки были NUMERIC(14,2)
+ALTER TABLE user_balances
+    ALTER COLUMN income TYPE NUMERIC,
+    ALTER COLUMN expense TYPE NUMERIC;
+
+CREATE OR REPLACE FUNCTION user_balances_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE user_balances SET
+            income = income - CASE WHEN OLD.type = 'income' THEN OLD.amount ELSE 0 END,
+            expense = expense - CASE WHEN OLD.type = 'expense' THEN OLD.amount ELSE 0 END
+        WHERE user_id = OLD.user_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO user_balances (user_id, income, expense)
+        VALUES (
+            NEW.user_id,
+            CASE WHEN NEW.type = 'income' THEN NEW.amount ELSE 0 END,
+            CASE WHEN NEW.type = 'expense' THEN NEW.amount ELSE 0 END
+        )
+        ON CONFLICT (user_id) DO UPDATE SET
+            income = user_balances.income + EXCLUDED.income,
+            expense = user_balances.expense + EXCLUDED.expense;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS transactions_user_balances ON transactions;
+
+CREATE TRIGGER transactions_user_balances
+AFTER INSERT OR UPDATE OR DELETE ON transactions
+FOR EACH ROW EXECUTE FUNCTION user_balances_apply();
+"""
+
+# пересчёт с нуля – для баз, где транзакции появились раньше триггера
+USER_BALANCES_BACKFILL = """
+INSERT INTO user_balances (user_id, income, expense)
+SELECT
+    user_id,
+    COALESCE(SUM(amount) FILTER (WHERE type = 'income'), 0),
+    COALESCE(SUM(amount) FILTER (WHERE type = 'expense'), 0)
+FROM transactions
+GROUP BY user_id
+ON CONFLICT (user_id) DO UPDATE SET
+    income = EXCLUDED.income,
+    expense = EXCLUDED.expense;
+"""
+
+event.listen(
+    Transaction.__table__,
+    "after_create",
+    DDL(USER_BALANCES_DDL).execute_if(dialect="postgresql"),
+)
+
+
+def install_user_balances() -> None:
+    """Ставим триггер и пересчитываем user_balances в уже существующей базе."""
+    if db.engine.dialect.name != "postgresql":
+        return
+    with db.engine.begin() as conn:
+        conn.execute(DDL(USER_BALANCES_DDL))
+        conn.execute(DDL(USER_BALANCES_BACKFILL))
 
 
 # ------------------------------------------------------------------------------
@@ -131,9 +395,75 @@ class Transaction(db.Model):
 # ------------------------------------------------------------------------------
 
 
+USER_CACHE_TTL = 300
+
+
+@dataclass(frozen=True)
+class CachedUser(UserMixin):
+    """Лёгкая копия User для current_user: без состояния сессии SQLAlchemy.
+
+    Изменять пользователя нужно через модель User, после чего
+    вызывать invalidate_user_cache().
+    """
+
+    id: int
+    name: str
+    email: str
+    initial_balance: Decimal | None
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            initial_balance=user.initial_balance,
+        )
+
+    def to_json(self) -> str:
+        balance = self.initial_balance
+        return json.dumps(
+            {
+                "id": self.id,
+                "name": self.name,
+                "email": self.email,
+                "initial_balance": None if balance is None else str(balance),
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw) -> "CachedUser":
+        data = json.loads(raw)
+        balance = data["initial_balance"]
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            email=data["email"],
+            initial_balance=None if balance is None else Decimal(balance),
+        )
+
+
+def _user_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    cache_delete(_user_cache_key(user_id))
+
+
 @login_manager.user_loader
 def load_user(user_id: str):
-    return User.query.get(int(user_id))
+    uid = int(user_id)
+    cached = cache_get(_user_cache_key(uid))
+    if cached is not None:
+        return CachedUser.from_json(cached)
+
+    user = db.session.get(User, uid)
+    if user is None:
+        return None
+    cached_user = CachedUser.from_user(user)
+    cache_set(_user_cache_key(uid), cached_user.to_json(), USER_CACHE_TTL)
+    return cached_user
 
 
 # ------------------------------------------------------------------------------
@@ -154,15 +484,166 @@ def create_default_categories(user: User) -> None:
         ("Фриланс", "income"),
         ("Подарки", "income"),
     ]
+    # SQLAlchemy 2.0 сам отправляет эти INSERT пачкой (insertmanyvalues)
     for name, type_ in defaults:
         db.session.add(Category(name=name, type=type_, user=user))
 
 
+CATEGORY_CACHE_TTL = 3600
+
+
+# Списки лежат под ключом с «поколением» пользователя (cats_gen:{id}).
+# После COMMIT, изменившего категории, поколение меняется на новое
+# уникальное значение (time_ns, а не INCR – чтобы после вытеснения ключа
+# счётчик не вернулся к уже использованному номеру). Запрос,
+# который успел прочитать из БД старые строки, берёт поколение ещё до
+# чтения – и запишет их под старым ключом, который уже никто не читает.
+def _categories_generation_key(user_id: int) -> str:
+    return f"cats_gen:{user_id}"
+
+
+def _categories_generation(user_id: int) -> str | None:
+    if redis_client is None:
+        return None
+    key = _categories_generation_key(user_id)
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        # если ключа нет (новый пользователь, вытеснение) – начинаем с
+        # уникального значения, чтобы не попасть на старые записи
+        pipe.set(key, time.time_ns(), nx=True)
+        pipe.get(key)
+        _, generation = pipe.execute()
+    except redis.RedisError:
+        return None
+    return generation.decode("ascii")
+
+
+def _categories_cache_key(user_id: int, generation: str, type_: str) -> str:
+    return f"cats:{user_id}:{generation}:{type_}"
+
+
+def user_categories(user_id: int, type_: str) -> list[dict]:
+    """Категории пользователя для выпадающих списков: [{"id": ..., "name": ...}]."""
+    # поколение – строго до запроса в БД
+    generation = _categories_generation(user_id)
+    key = None
+    if generation is not None:
+        key = _categories_cache_key(user_id, generation, type_)
+        cached = cache_get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+    rows = (
+        db.session.query(Category.id, Category.name)
+        .filter_by(user_id=user_id, type=type_)
+        .order_by(Category.id)
+        .all()
+    )
+    categories = [{"id": id_, "name": name} for id_, name in rows]
+    if key is not None:
+        cache_set(key, json.dumps(categories), CATEGORY_CACHE_TTL)
+    return categories
+
+
+def invalidate_category_cache(*user_ids: int) -> None:
+    # старые поколения просто истекут по CATEGORY_CACHE_TTL
+    generation = str(time.time_ns())
+    mapping = {_categories_generation_key(user_id): generation for user_id in user_ids}
+    if mapping:
+        cache_set_many(mapping)
+
+
+# любое изменение категорий сбрасывает кэш выпадающих списков пользователя.
+# Во время flush только запоминаем user_id, а поколение меняем после
+# COMMIT: раньше параллельный запрос мог бы закэшировать ещё старые строки
+# уже под новым поколением.
+_CATEGORY_CACHE_PENDING = "category_cache_user_ids"
+
+
+@event.listens_for(db.session, "after_flush")
+def _collect_changed_categories(session, flush_context) -> None:
+    user_ids = {
+        obj.user_id
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, Category)
+    }
+    if user_ids:
+        session.info.setdefault(_CATEGORY_CACHE_PENDING, set()).update(user_ids)
+
+
+@event.listens_for(db.session, "after_commit")
+def _invalidate_changed_categories(session) -> None:
+    user_ids = session.info.pop(_CATEGORY_CACHE_PENDING, None)
+    if user_ids:
+        invalidate_category_cache(*user_ids)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_changed_categories(session) -> None:
+    session.info.pop(_CATEGORY_CACHE_PENDING, None)
+
+
+def transaction_list_options() -> list:
+    """Опции загрузки для списков транзакций: категории – одним IN-запросом."""
+    options = [selectinload(Transaction.category)]
+    if app.config["SQLALCHEMY_RAISELOAD"]:
+        options.append(raiseload("*"))
+    return options
+
+
+TRANSACTIONS_PAGE_SIZE = 50
+
+
+def parse_cursor(raw: str | None) -> tuple[datetime, int] | None:
+    """Курсор страницы транзакций "<created_at ISO>_<id>"; мусор – первая страница."""
+    if not raw:
+        return None
+    created_raw, _, id_raw = raw.rpartition("_")
+    try:
+        return datetime.fromisoformat(created_raw), int(id_raw)
+    except ValueError:
+        return None
+
+
+def make_cursor(tx: "Transaction") -> str:
+    return f"{tx.created_at.isoformat()}_{tx.id}"
+
+
+def recent_transactions(
+    user_id: int,
+    start_dt: datetime,
+    cursor: tuple[datetime, int] | None = None,
+    limit: int = TRANSACTIONS_PAGE_SIZE,
+) -> list:
+    """Транзакции от новых к старым, страница после cursor.
+
+    Keyset вместо OFFSET: (created_at, id) < курсор – это seek по индексу
+    ix_tx_user_created, глубина страницы на скорость не влияет.
+    """
+    query = Transaction.query.options(*transaction_list_options()).filter(
+        Transaction.user_id == user_id,
+        Transaction.created_at >= start_dt,
+    )
+    if cursor is not None:
+        query = query.filter(tuple_(Transaction.created_at, Transaction.id) < cursor)
+    return (
+        query.order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+# "1 234,56" -> "1234.56" за один проход по строке
+_DECIMAL_INPUT_TABLE = str.maketrans({" ": None, ",": "."})
+# "1,234" -> "1 234"
+_THOUSANDS_TABLE = str.maketrans({",": " "})
+
+
 def parse_decimal(raw: str) -> Decimal:
     """Безопасно парсим строку в Decimal, поддерживаем запятую."""
     if raw is None:
         raise InvalidOperation("empty")
-    cleaned = raw.replace(" ", "").replace(",", ".")
+    cleaned = raw.translate(_DECIMAL_INPUT_TABLE)
     return Decimal(cleaned)
 
 
@@ -171,16 +652,21 @@ def parse_decimal(raw: str) -> Decimal:
 def currency_filter(value):
     if value is None:
         return "0,00 ₽"
-    try:
-        if not isinstance(value, Decimal):
+    if not isinstance(value, (Decimal, int)):
+        # float/строка – редкий путь, суммы из ORM приходят как Decimal
+        try:
             value = Decimal(str(value))
-        value = value.quantize(Decimal("0.01"))
-        # 1234.56 -> '1,234.56' -> '1 234,56 ₽'
-        s = f"{value:,.2f}"
-        s = s.replace(",", " ").replace(".", ",")
-        return f"{s} ₽"
-    except Exception:
+        except InvalidOperation:
+            return str(value)
+    if isinstance(value, Decimal) and not value.is_finite():
+        # NaN/Infinity не округлить до копеек
         return str(value)
+    # 1234.56 -> 123456 копеек -> '1 234,56 ₽'
+    # round() для Decimal округляет как quantize по умолчанию (банковское)
+    cents = round(value * 100)
+    sign = "-" if cents < 0 else ""
+    whole, frac = divmod(abs(cents), 100)
+    return f"{sign}{whole:,}".translate(_THOUSANDS_TABLE) + f",{frac:02d} ₽"
 
 
 # ------------------------------------------------------------------------------
@@ -245,6 +731,10 @@ def login():
 
         user = User.query.filter_by(email=email).first()
         if user and user.check_password(password):
+            if user.needs_rehash():
+                # прозрачно переводим старый хеш на bcrypt
+                user.set_password(password)
+                db.session.commit()
             login_user(user)
             flash("Добро пожаловать!", "success")
             return redirect(url_for("setup_balance"))
@@ -283,8 +773,11 @@ def setup_balance():
             flash("Некорректный баланс.", "error")
             return redirect(url_for("setup_balance"))
 
-        current_user.initial_balance = amount
+        # current_user – кэшированная копия, пишем в саму модель
+        user = db.session.get(User, current_user.id)
+        user.initial_balance = amount
         db.session.commit()
+        invalidate_user_cache(user.id)
         flash("Начальный баланс сохранён.", "success")
         return redirect(url_for("dashboard"))
 
@@ -300,11 +793,6 @@ def dashboard():
     user_id = current_user.id
 
     # период: week | month | year
-    period = request.args.get("period", "month")
-    today = datetime.utcnow().date()
-
-    from datetime import date
-
     period = request.args.get("period", "month")
     today = date.today()
 
@@ -328,36 +816,49 @@ def dashboard():
         Transaction.created_at >= start_dt,
     )
 
-    # последние транзакции
-    transactions = base_query.order_by(Transaction.created_at.desc()).limit(50).all()
-
-    # сумма доходов и расходов
-    total_income = (
-        db.session.query(func.coalesce(func.sum(Transaction.amount), 0))
-        .filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "income",
-            Transaction.created_at >= start_dt,
-        )
-        .scalar()
+    # последние транзакции (страница по курсору из ?cursor=...)
+    transactions = recent_transactions(
+        user_id, start_dt, cursor=parse_cursor(request.args.get("cursor"))
     )
+    next_cursor = None
+    if len(transactions) == TRANSACTIONS_PAGE_SIZE:
+        next_cursor = make_cursor(transactions[-1])
+
+    # за всё время суммы уже посчитаны триггером – читаем одну строку
+    totals = None
+    if period == "all":
+        totals = (
+            db.session.query(UserBalance.income, UserBalance.expense)
+            .filter(UserBalance.user_id == user_id)
+            .first()
+        )
 
-    total_expense = (
-        db.session.query(func.coalesce(func.sum(Transaction.amount), 0))
-        .filter(
-            Transaction.user_id == user_id,
-            Transaction.type == "expense",
-            Transaction.created_at >= start_dt,
+    # сумма доходов и расходов – один проход по транзакциям периода
+    if totals is None:
+        totals = (
+            db.session.query(
+                func.coalesce(
+                    func.sum(Transaction.amount).filter(Transaction.type == "income"), 0
+                ),
+                func.coalesce(
+                    func.sum(Transaction.amount).filter(Transaction.type == "expense"), 0
+                ),
+            )
+            .filter(
+                Transaction.user_id == user_id,
+                Transaction.created_at >= start_dt,
+            )
+            .one()
         )
-        .scalar()
-    )
+    total_income, total_expense = totals
 
     initial = current_user.initial_balance or Decimal("0")
     balance = initial + (total_income or 0) - (total_expense or 0)
 
     # расходы по категориям
     expense_rows = (
-        db.session.query(Category.name, func.sum(Transaction.amount))
+        # для диаграммы сразу получаем float из БД – без промежуточных Decimal
+        db.session.query(Category.name, func.sum(Transaction.amount).cast(db.Float))
         .join(Transaction, Transaction.category_id == Category.id)
         .filter(
             Transaction.user_id == user_id,
@@ -365,10 +866,13 @@ def dashboard():
             Transaction.created_at >= start_dt,
         )
         .group_by(Category.name)
-        .all()
     )
-    expense_labels = [row[0] for row in expense_rows]
-    expense_values = [float(row[1]) for row in expense_rows]
+    # строк не больше, чем категорий – раскладываем за один проход по курсору
+    expense_labels = []
+    expense_values = []
+    for name, total in expense_rows:
+        expense_labels.append(name)
+        expense_values.append(total)
 
     # доходы vs расходы
     income_vs_expense_labels = ["Доходы", "Расходы"]
@@ -376,19 +880,16 @@ def dashboard():
 
     # Топ-5 трат
     top_expenses = (
-        base_query.filter(Transaction.type == "expense")
+        base_query.options(*transaction_list_options())
+        .filter(Transaction.type == "expense")
         .order_by(Transaction.amount.desc())
         .limit(5)
         .all()
     )
 
     # категории для формы
-    expense_categories = Category.query.filter_by(
-        user_id=user_id, type="expense"
-    ).all()
-    income_categories = Category.query.filter_by(
-        user_id=user_id, type="income"
-    ).all()
+    expense_categories = user_categories(user_id, "expense")
+    income_categories = user_categories(user_id, "income")
 
     currency_rates = fetch_currency_rates()
 
@@ -413,6 +914,7 @@ def dashboard():
         total_income=total_income,
         total_expense=total_expense,
         transactions=transactions,
+        next_cursor=next_cursor,
         top_expenses=top_expenses,
         expense_labels=expense_labels,
         expense_values=expense_values,
@@ -428,6 +930,25 @@ def dashboard():
     )
 
 
+@app.after_request
+def dashboard_etag(response):
+    """ETag по содержимому дашборда: при повторном визите без изменений – 304 без тела.
+
+    ETag слабый, чтобы Compress не дописывал к нему ":gzip" и браузер
+    мог прислать его обратно в If-None-Match.
+    """
+    if (
+        request.endpoint == "dashboard"
+        and request.method == "GET"
+        and response.status_code == 200
+    ):
+        # данные личные: кэшировать только в браузере и всегда перепроверять
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.add_etag(weak=True)
+        response.make_conditional(request)
+    return response
+
+
 # ------------------------------------------------------------------------------
 # Добавление / редактирование / удаление транзакций
 # ------------------------------------------------------------------------------
@@ -544,9 +1065,9 @@ def edit_transaction(tx_id):
     # для формы редактирования нужны категории
     # Категории соответствуют ТИПУ КАТЕГОРИИ, а не типу транзакции
     if tx.category.type == "expense":
-        categories = Category.query.filter_by(user_id=current_user.id, type="expense").all()
+        categories = user_categories(current_user.id, "expense")
     else:
-        categories = Category.query.filter_by(user_id=current_user.id, type="income").all()
+        categories = user_categories(current_user.id, "income")
 
     tx_date = tx.created_at.date()
 
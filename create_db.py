@@ -1,7 +1,9 @@
-from app import db, app
+from app import db, app, install_user_balances
 
 # простой скрипт для начального создания таблиц
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()
+        # триггер user_balances и пересчёт сумм (для уже существующей базы)
+        install_user_balances()
         print("База данных и таблицы созданы.")